@@ -1,16 +1,147 @@
 #!/usr/bin/env python3
+import functools
 import json
+import logging
 import os
+import re
+import shutil
 import sys
 import subprocess
 from subprocess import run
 
+# Optional fast JSON decoders, fastest first; stdlib json handles bytes too so
+# the call sites don't care which one is active
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from msgspec.json import decode as json_loads
+    except ImportError:
+        json_loads = json.loads
+
+# Optional HTML minifiers; renderer tokenization cost is linear in byte count,
+# so shrinking the document up front is a cheap win when a minifier is installed
+try:
+    from minify_html import minify as _minify_html
+
+    def minify_html_content(html_content):
+        try:
+            return _minify_html(html_content, minify_css=True, minify_js=True,
+                                keep_closing_tags=True,
+                                keep_html_and_head_opening_tags=True)
+        except Exception:
+            return html_content
+except ImportError:
+    try:
+        import htmlmin
+
+        def minify_html_content(html_content):
+            try:
+                return htmlmin.minify(html_content, remove_comments=True)
+            except Exception:
+                return html_content
+    except ImportError:
+        def minify_html_content(html_content):
+            return html_content
+
+logging.basicConfig(
+    stream=sys.stderr,
+    level=os.environ.get('RESUME_LOG_LEVEL', 'INFO').upper(),
+    format='%(levelname)s %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+# System info spawns wkhtmltopdf/fc-list; only collect it when explicitly debugging
+RESUME_DEBUG = bool(os.environ.get('RESUME_DEBUG'))
+
+# Resolve the renderer binary once so every spawn skips the PATH walk
+WKHTMLTOPDF_BIN = shutil.which('wkhtmltopdf') or 'wkhtmltopdf'
+
+# Frontend bundles ship app-wide stylesheets and scripts that are useless for
+# print rendering: wkhtmltopdf would download/parse the CSS and never run the JS.
+BUNDLE_CSS_LINK_RE = re.compile(r'<link[^>]+href="[^"]*\.(?:bundle|app|main)[^"]*\.css[^"]*"[^>]*>', re.I)
+SCRIPT_BLOCK_RE = re.compile(r'<script\b[^>]*>.*?</script>', re.I | re.S)
+
+
+# Static wkhtmltopdf rendering options, built once at import instead of per call
+WKHTMLTOPDF_OPTS = [
+    # Progress chatter would otherwise accumulate in the captured stderr pipe;
+    # errors are still reported with --quiet
+    '--quiet',
+    '--page-size', 'Letter',
+    # Minimal top margin to reduce white space on first page
+    '--margin-top', '2',   # ~0.03in (minimal top whitespace for first page)
+    '--margin-right', '0',
+    # Minimal bottom margin
+    '--margin-bottom', '2',  # ~0.03in (minimal bottom whitespace)
+    '--margin-left', '0',
+    '--print-media-type',
+    '--zoom', '1.0',
+    '--dpi', '96',
+    '--disable-smart-shrinking',
+]
+
+# Custom CSS for page break controls and Skills section, built once instead of
+# inline in every command assembly
+PRINT_CSS = (
+    '.experience-item{page-break-inside:avoid!important;break-inside:avoid!important;'
+    'orphans:3!important;widows:3!important;}'
+    '.education-item{page-break-inside:avoid!important;break-inside:avoid!important;'
+    'orphans:3!important;widows:3!important;}'
+    '.preview .section-header{page-break-after:avoid!important;break-after:avoid!important;'
+    'orphans:3!important;widows:3!important;}'
+    '.preview .skills-section-header{page-break-before:always!important;break-before:page!important;'
+    'page-break-after:avoid!important;break-after:avoid!important;margin-top:0!important;}'
+    '.preview .skills-content{page-break-before:avoid!important;page-break-inside:avoid!important;'
+    'break-inside:avoid!important;orphans:3!important;widows:3!important;}'
+)
+PRINT_CSS_URI = 'data:text/css,' + PRINT_CSS
+
+# Opt-in in-process renderer: avoids the wkhtmltopdf fork/exec per request
+# where WeasyPrint is installed and its output has been validated
+USE_WEASYPRINT = bool(os.environ.get('USE_WEASYPRINT'))
+_weasyprint = None
+
+
+def _render_with_weasyprint(html_path, html_content, output_path):
+    """Render in-process with WeasyPrint; returns (success, error)"""
+    global _weasyprint
+    try:
+        if _weasyprint is None:
+            from weasyprint import HTML, CSS
+            _weasyprint = (HTML, CSS)
+        HTML, CSS = _weasyprint
+        if html_path:
+            source = HTML(filename=html_path)
+        else:
+            source = HTML(string=html_content)
+        source.write_pdf(output_path, stylesheets=[CSS(string=PRINT_CSS)])
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def strip_screen_only_assets(html_content):
+    """Remove app bundle stylesheet links and script blocks before PDF rendering"""
+    original_len = len(html_content)
+    # Cheap membership checks short-circuit the regex passes for documents
+    # that contain no link/script tags at all
+    if '<link' in html_content:
+        html_content = BUNDLE_CSS_LINK_RE.sub('', html_content)
+    if '<script' in html_content:
+        html_content = SCRIPT_BLOCK_RE.sub('', html_content)
+    removed = original_len - len(html_content)
+    if removed:
+        logger.debug("Stripped %d bytes of screen-only assets from HTML", removed)
+    return html_content
+
+@functools.lru_cache(maxsize=1)
 def get_system_info():
     """Get system info for debugging Docker vs local differences"""
     info = {}
     try:
         # Get wkhtmltopdf version
-        result = run(['wkhtmltopdf', '--version'], capture_output=True, text=True)
+        result = run([WKHTMLTOPDF_BIN, '--version'], capture_output=True, text=True)
         info['wkhtmltopdf_version'] = result.stdout.strip() if result.returncode == 0 else result.stderr.strip()
     except Exception as e:
         info['wkhtmltopdf_version'] = f"Error: {e}"
@@ -31,6 +162,7 @@ def generate_html_resume(template_name, user_data, output_path):
     html_content = user_data.get('htmlContent', '')
     if not html_content:
         return False, "HTML content is required"
+    html_content = minify_html_content(strip_screen_only_assets(html_content))
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
@@ -39,101 +171,138 @@ def generate_html_resume(template_name, user_data, output_path):
         return False, str(e)
 
 def generate_pdf_resume(template_name, user_data, output_path):
-    # Determine HTML source: either provided path or content
+    # Determine HTML source: either provided path or in-memory content piped via stdin
     provided_html_path = user_data.get('htmlPath')
     if provided_html_path and os.path.exists(provided_html_path):
         html_path = provided_html_path
+        html_content = None
     else:
-        html_path = output_path.replace('.pdf', '.html')
-        success, error = generate_html_resume(template_name, user_data, html_path)
-        if not success:
-            return False, error
+        html_path = None
+        html_content = user_data.get('htmlContent', '')
+        if not html_content:
+            return False, "HTML content is required"
+        html_content = minify_html_content(strip_screen_only_assets(html_content))
 
     try:
-        # Log system info for debugging
-        system_info = get_system_info()
-        print(f"PDF Generation Debug Info: {json.dumps(system_info, indent=2)}")
-        
-        # Log HTML content details for debugging
-        try:
-            with open(html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-                print(f"HTML Content Length: {len(html_content)} characters")
-                print(f"HTML Content Preview (first 500 chars): {html_content[:500]}")
+        # Log system info for debugging; costs two subprocess spawns so gate it
+        if RESUME_DEBUG:
+            logger.debug("PDF Generation Debug Info: %s", json.dumps(get_system_info(), indent=2))
+
+        # Log HTML content details for debugging; skip the preview work entirely
+        # unless debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                if html_content is None:
+                    with open(html_path, 'r', encoding='utf-8') as f:
+                        log_content = f.read()
+                else:
+                    log_content = html_content
+                logger.debug("HTML Content Length: %d characters", len(log_content))
+                logger.debug("HTML Content Preview (first 500 chars): %s", log_content[:500])
                 # Check for specific CSS properties
-                if '@page' in html_content:
-                    print("Found @page CSS rule in HTML")
-                if '.preview' in html_content:
-                    print("Found .preview CSS class in HTML")
-                if 'width:' in html_content:
-                    print("Found width CSS property in HTML")
-        except Exception as e:
-            print(f"Error reading HTML for logging: {e}")
-        
+                if '@page' in log_content:
+                    logger.debug("Found @page CSS rule in HTML")
+                if '.preview' in log_content:
+                    logger.debug("Found .preview CSS class in HTML")
+                if 'width:' in log_content:
+                    logger.debug("Found width CSS property in HTML")
+            except Exception as e:
+                logger.debug("Error reading HTML for logging: %s", e)
+
+        # In-process render when enabled; fall through to wkhtmltopdf on failure
+        if USE_WEASYPRINT:
+            success, error = _render_with_weasyprint(html_path, html_content, output_path)
+            if success:
+                logger.info("Generated PDF size: %d bytes", os.path.getsize(output_path))
+                return True, None
+            logger.warning("WeasyPrint render failed (%s); falling back to wkhtmltopdf", error)
+
         # Convert HTML to PDF using wkhtmltopdf with balanced margins
         cmd = [
-            'wkhtmltopdf',
-            '--page-size', 'Letter',
-            # Minimal top margin to reduce white space on first page
-            '--margin-top', '2',   # ~0.03in (minimal top whitespace for first page)
-            '--margin-right', '0',
-            # Minimal bottom margin
-            '--margin-bottom', '2',  # ~0.03in (minimal bottom whitespace)
-            '--margin-left', '0',
-            '--print-media-type',
-            '--zoom', '1.0',
-            '--dpi', '96',
-            '--disable-smart-shrinking',
-            # Add custom CSS for page break controls and Skills section
-            '--user-style-sheet', 'data:text/css,.experience-item{page-break-inside:avoid!important;break-inside:avoid!important;orphans:3!important;widows:3!important;}.education-item{page-break-inside:avoid!important;break-inside:avoid!important;orphans:3!important;widows:3!important;}.preview .section-header{page-break-after:avoid!important;break-after:avoid!important;orphans:3!important;widows:3!important;}.preview .skills-section-header{page-break-before:always!important;break-before:page!important;page-break-after:avoid!important;break-after:avoid!important;margin-top:0!important;}.preview .skills-content{page-break-before:avoid!important;page-break-inside:avoid!important;break-inside:avoid!important;orphans:3!important;widows:3!important;}',
-            html_path,
+            WKHTMLTOPDF_BIN,
+            *WKHTMLTOPDF_OPTS,
+            '--user-style-sheet', PRINT_CSS_URI,
+            # '-' reads the HTML from stdin, skipping the temp file roundtrip
+            html_path if html_path else '-',
             output_path
         ]
-        
-        print(f"Running command: {' '.join(cmd)}")
-        result = run(cmd, capture_output=True, text=True)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Running command: %s", ' '.join(cmd))
+        # Keep only stderr for error reporting; never buffer wkhtmltopdf's stdout
+        result = run(cmd, input=html_content, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.PIPE, text=True)
 
         if result.returncode != 0:
-            print(f"wkhtmltopdf stderr: {result.stderr}")
+            logger.error("wkhtmltopdf stderr: %s", result.stderr)
             return False, f"wkhtmltopdf failed: {result.stderr}"
-        
-        print(f"wkhtmltopdf stdout: {result.stdout}")
-        
+
         # Log PDF file details
         if os.path.exists(output_path):
-            pdf_size = os.path.getsize(output_path)
-            print(f"Generated PDF size: {pdf_size} bytes")
+            logger.info("Generated PDF size: %d bytes", os.path.getsize(output_path))
         else:
-            print("Warning: PDF file was not created")
-        
-        # Do not delete html if it was uploaded
-        try:
-            if not provided_html_path and os.path.exists(html_path):
-                os.unlink(html_path)
-        except Exception:
-            pass
+            logger.warning("PDF file was not created")
+
         return True, None
     except Exception as e:
         return False, str(e)
 
+def _render_one(job):
+    """Render a single batch job dict; returns (output_path, success, error)"""
+    template_name = job.get('template', 'modern')
+    user_data = job.get('userData', {})
+    output_path = job['output']
+    if output_path.lower().endswith('.pdf'):
+        success, error = generate_pdf_resume(template_name, user_data, output_path)
+    else:
+        success, error = generate_html_resume(template_name, user_data, output_path)
+    return output_path, success, error
+
+
+def batch_main(jobs_path):
+    """Render a JSON array of jobs in parallel, one wkhtmltopdf per core"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(jobs_path, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for output_path, success, error in ex.map(_render_one, jobs):
+            if success:
+                logger.info("Generated %s", output_path)
+            else:
+                failures += 1
+                logger.error("Failed to generate %s: %s", output_path, error)
+    if failures:
+        logger.error("%d of %d jobs failed", failures, len(jobs))
+        sys.exit(1)
+
+
 def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--batch':
+        batch_main(sys.argv[2])
+        return
+
     if len(sys.argv) != 4:
         print("Usage: generate_resume.py <template_name> <user_data_json|'-'> <output_path>")
+        print("       generate_resume.py --batch <jobs_json_path>")
         sys.exit(1)
 
     template_name = sys.argv[1]
     # Support large payloads via stdin: pass '-' as the second arg
     if sys.argv[2] == '-':
         try:
-            user_data = json.load(sys.stdin)
+            # Read raw bytes; all decoders parse bytes without a str roundtrip
+            user_data = json_loads(sys.stdin.buffer.read())
         except Exception as e:
-            print(f"Failed to read user data JSON from stdin: {e}")
+            logger.error("Failed to read user data JSON from stdin: %s", e)
             sys.exit(1)
     else:
         try:
-            user_data = json.loads(sys.argv[2])
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse user data JSON: {e}")
+            user_data = json_loads(sys.argv[2])
+        except ValueError as e:
+            logger.error("Failed to parse user data JSON: %s", e)
             sys.exit(1)
     output_path = sys.argv[3]
 
@@ -143,10 +312,10 @@ def main():
     else:
         success, error = generate_html_resume(template_name, user_data, output_path)
     if not success:
-        print(f"Failed to generate resume: {error}")
+        logger.error("Failed to generate resume: %s", error)
         sys.exit(1)
 
-    print(f"Successfully generated {'PDF' if is_pdf else 'HTML'} resume at {output_path}")
+    logger.info("Successfully generated %s resume at %s", 'PDF' if is_pdf else 'HTML', output_path)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,62 +1,137 @@
 #!/usr/bin/env python3
 import sys
 import os
+import hashlib
 import json
 import re
 import subprocess
+import tempfile
 
-# Optional imports guarded; we won't crash if a format lib is missing
+import importlib
+
+# Optional fast JSON encoder; cheap to import unconditionally, unlike the
+# format libraries below
 try:
-    # Try different import paths for pdfminer
-    try:
-        from pdfminer.high_level import extract_text as pdf_extract_text
-    except ImportError:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Heavy format libraries are imported lazily on first use, so e.g. a .txt
+# parse never pays the pdfminer/fitz import cost. A failed import is cached
+# as None and only reported once; we won't crash if a format lib is missing.
+_lazy_modules = {}
+
+
+def lazy_import(name: str):
+    if name not in _lazy_modules:
         try:
-            from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-            from pdfminer.converter import TextConverter
-            from pdfminer.layout import LAParams
-            from pdfminer.pdfpage import PDFPage
-            from io import StringIO
-            
-            def pdf_extract_text(path):
-                resource_manager = PDFResourceManager()
-                string_io = StringIO()
-                converter = TextConverter(resource_manager, string_io, laparams=LAParams())
-                with open(path, 'rb') as file:
-                    interpreter = PDFPageInterpreter(resource_manager, converter)
-                    for page in PDFPage.create_pages(file):
-                        interpreter.process_page(page)
-                text = string_io.getvalue()
-                converter.close()
-                string_io.close()
-                return text
-        except ImportError:
-            pdf_extract_text = None
-except Exception as e:
-    print(f"PDF extraction setup failed: {e}", file=sys.stderr)
-    pdf_extract_text = None
+            _lazy_modules[name] = importlib.import_module(name)
+        except Exception as e:
+            print(f"{name} import failed: {e}", file=sys.stderr)
+            _lazy_modules[name] = None
+    return _lazy_modules[name]
 
-# Try PyMuPDF (fitz) as another PDF extraction method
-try:
-    import fitz  # PyMuPDF
-    def fitz_extract_text(path):
+
+def pdfminer_extract_text(path):
+    high_level = lazy_import('pdfminer.high_level')
+    if high_level is not None:
+        return high_level.extract_text(path)
+    # Older pdfminer without high_level: drive the converter stack directly
+    pdfinterp = lazy_import('pdfminer.pdfinterp')
+    converter = lazy_import('pdfminer.converter')
+    layout = lazy_import('pdfminer.layout')
+    pdfpage = lazy_import('pdfminer.pdfpage')
+    if None in (pdfinterp, converter, layout, pdfpage):
+        return ""
+    from io import StringIO
+    resource_manager = pdfinterp.PDFResourceManager()
+    string_io = StringIO()
+    text_converter = converter.TextConverter(resource_manager, string_io,
+                                             laparams=layout.LAParams())
+    with open(path, 'rb') as file:
+        interpreter = pdfinterp.PDFPageInterpreter(resource_manager, text_converter)
+        for page in pdfpage.PDFPage.create_pages(file):
+            interpreter.process_page(page)
+    text = string_io.getvalue()
+    text_converter.close()
+    string_io.close()
+    return text
+
+
+# Below this page count the fork overhead of a process pool costs more
+# than the extraction it parallelizes; typical resumes are 1-3 pages
+FITZ_PARALLEL_MIN_PAGES = 16
+
+
+def _fitz_extract_range(args):
+    import fitz  # runs in a pool worker, which has its own interpreter
+    path, lo, hi = args
+    d = fitz.open(path)
+    try:
+        return "".join(d[i].get_text("text") for i in range(lo, hi))
+    finally:
+        d.close()
+
+
+def fitz_extract_text(path):
+    fitz = lazy_import('fitz')  # PyMuPDF
+    if fitz is None:
+        return ""
+    try:
+        doc = fitz.open(path)
         try:
-            doc = fitz.open(path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
+            page_count = doc.page_count
+            if page_count < FITZ_PARALLEL_MIN_PAGES:
+                # list + join instead of += so the buffer isn't recopied
+                # per page; "text" mode skips the layout analyzer
+                return "".join(page.get_text("text") for page in doc)
+        finally:
             doc.close()
-            return text
-        except Exception as e:
-            print(f"PyMuPDF extraction failed: {e}", file=sys.stderr)
-            return ""
-except ImportError:
-    fitz_extract_text = None
+        # Large document: split page ranges across cores, each worker
+        # opening its own handle
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(os.cpu_count() or 1, page_count)
+        chunk = -(-page_count // workers)
+        ranges = [(path, lo, min(lo + chunk, page_count))
+                  for lo in range(0, page_count, chunk)]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return "".join(ex.map(_fitz_extract_range, ranges))
+    except Exception as e:
+        print(f"PyMuPDF extraction failed: {e}", file=sys.stderr)
+        return ""
+
+
+def pdfium_extract_text(path):
+    pdfium = lazy_import('pypdfium2')
+    if pdfium is None:
+        return ""
+    try:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return "\n".join(page.get_textpage().get_text_range() for page in pdf)
+        finally:
+            pdf.close()
+    except Exception as e:
+        print(f"pypdfium2 extraction failed: {e}", file=sys.stderr)
+        return ""
 
-# Try poppler-utils as a system command fallback
+
+# Try poppler-utils, in-process when the libpoppler binding exists (loads the
+# library once per process instead of a fork/exec per file), else as a command
 def poppler_extract_text(path):
+    pdftotext = lazy_import('pdftotext')
+    if pdftotext is not None:
+        try:
+            with open(path, 'rb') as f:
+                return "\n\n".join(pdftotext.PDF(f))
+        except Exception as e:
+            print(f"pdftotext binding failed: {e}", file=sys.stderr)
+            # fall through to the CLI path
     try:
-        result = subprocess.run(['pdftotext', path, '-'], 
+        # -raw skips poppler's physical-layout reconstruction (we re-tokenize
+        # downstream anyway), -nopgbrk drops form feeds, and a fixed encoding
+        # avoids locale-dependent output
+        result = subprocess.run(['pdftotext', '-raw', '-nopgbrk', '-enc', 'UTF-8', path, '-'],
                               capture_output=True, text=True, timeout=30)
         if result.returncode == 0:
             return result.stdout
@@ -67,42 +142,146 @@ def poppler_extract_text(path):
         print(f"Poppler command failed: {e}", file=sys.stderr)
         return ""
 
-try:
-    import docx
-except Exception as e:
-    print(f"DOCX import failed: {e}", file=sys.stderr)
-    docx = None
+# re.ASCII keeps \d/\s on the fast ASCII tables; emails and phone numbers are
+# ASCII by construction. One alternation finds both in a single pass over the
+# text instead of one full scan per pattern.
+BASICS_PATTERN = (
+    r"(?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})"
+    r"|(?P<phone>\+?\d[\d\-\s\(\)]{7,}\d)"
+)
+BASICS_RE = re.compile(BASICS_PATTERN, re.ASCII)
 
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-PHONE_RE = re.compile(r"(\+?\d[\d\-\s\(\)]{7,}\d)")
+# Optional: google-re2 is a DFA engine with guaranteed linear-time matching,
+# which also rules out backtracking blowups on number-heavy blobs. Its API is
+# re-compatible for the finditer/lastgroup usage below.
+try:
+    import re2
+    BASICS_RE = re2.compile(BASICS_PATTERN)
+except Exception:
+    pass
 
 SECTION_KEYS = [
     'experience', 'work experience', 'professional experience',
     'education', 'skills', 'summary', 'objective', 'projects'
 ]
 
+# Single precompiled union so header detection is one C-level scan per line
+# instead of a Python loop of substring checks over SECTION_KEYS
+SECTION_KEY_RE = re.compile('|'.join(re.escape(k) for k in SECTION_KEYS), re.ASCII)
+
+# Optional Aho-Corasick automaton: matches all keys in one trie walk, which
+# beats regex alternation as the key list grows
+try:
+    import ahocorasick
+    _SECTION_AUTOMATON = ahocorasick.Automaton()
+    for _k in SECTION_KEYS:
+        _SECTION_AUTOMATON.add_word(_k, _k)
+    _SECTION_AUTOMATON.make_automaton()
+
+    def has_section_key(lower: str) -> bool:
+        return next(_SECTION_AUTOMATON.iter(lower), None) is not None
+except ImportError:
+    def has_section_key(lower: str) -> bool:
+        return SECTION_KEY_RE.search(lower) is not None
+
 
 def read_txt(path: str) -> str:
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        return f.read()
+    # Read bytes and decode once; skips the incremental decoder in the text
+    # I/O layer
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8', 'ignore')
+
+
+# Extraction is deterministic per file, so cache text by content hash; hashing
+# is microseconds against the seconds a re-parse can cost
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'resume-cache')
+CACHE_MAX_ENTRIES = 256
+
+
+def _content_cache_path(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        # 1 MiB chunks keep peak memory flat for large files
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return os.path.join(CACHE_DIR, h.hexdigest() + '.txt')
+
+
+def _cache_get(cache_path: str):
+    try:
+        with open(cache_path, 'rb') as f:
+            return f.read().decode('utf-8', 'ignore')
+    except OSError:
+        return None
+
+
+def _cache_put(cache_path: str, text: str):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(text.encode('utf-8'))
+        os.replace(tmp, cache_path)
+        # crude LRU: drop the oldest entries when the directory grows too big
+        entries = [os.path.join(CACHE_DIR, n) for n in os.listdir(CACHE_DIR)]
+        if len(entries) > CACHE_MAX_ENTRIES:
+            entries.sort(key=os.path.getmtime)
+            for stale in entries[:len(entries) - CACHE_MAX_ENTRIES]:
+                os.unlink(stale)
+    except OSError as e:
+        print(f"Cache write failed: {e}", file=sys.stderr)
 
 
 def read_pdf(path: str) -> str:
-    """Try multiple PDF extraction methods in sequence"""
-    methods = []
-    
-    if pdf_extract_text is not None:
-        methods.append(("pdfminer", pdf_extract_text))
-    if fitz_extract_text is not None:
-        methods.append(("PyMuPDF", fitz_extract_text))
-    methods.append(("poppler", poppler_extract_text))
-    
+    """Try multiple PDF extraction methods in sequence, fastest backend first"""
+    try:
+        cache_path = _content_cache_path(path)
+    except OSError:
+        cache_path = None
+    if cache_path:
+        cached = _cache_get(cache_path)
+        if cached is not None:
+            print(f"Using cached extraction ({len(cached)} characters)", file=sys.stderr)
+            return cached
+
+    # Probe the first few pages for a text layer before running any extractor:
+    # image-only (scanned) resumes make every text extractor grind through the
+    # file just to come back empty, with pdfminer the worst offender
+    fitz = lazy_import('fitz')
+    if fitz is not None:
+        try:
+            d = fitz.open(path)
+            try:
+                has_text = any(d[i].get_text("text").strip()
+                               for i in range(min(d.page_count, 3)))
+            finally:
+                d.close()
+            if not has_text:
+                print("PDF has no text layer in its first pages; "
+                      "skipping text extractors (OCR would be required)", file=sys.stderr)
+                return ""
+        except Exception as e:
+            print(f"PDF text-layer probe failed: {e}", file=sys.stderr)
+
+    # C-backed extractors (libmupdf, PDFium) are an order of magnitude faster
+    # than pure-Python pdfminer, so try them first and keep pdfminer as the
+    # last resort; each extractor imports its own backend on first use and
+    # returns '' when it is unavailable
+    methods = [
+        ("PyMuPDF", fitz_extract_text),
+        ("pypdfium2", pdfium_extract_text),
+        ("poppler", poppler_extract_text),
+        ("pdfminer", pdfminer_extract_text),
+    ]
+
     for method_name, method_func in methods:
         try:
             print(f"Trying {method_name} extraction...", file=sys.stderr)
             text = method_func(path)
             if text and text.strip():
                 print(f"Successfully extracted {len(text)} characters using {method_name}", file=sys.stderr)
+                if cache_path:
+                    _cache_put(cache_path, text)
                 return text
             else:
                 print(f"{method_name} returned empty text", file=sys.stderr)
@@ -113,7 +292,52 @@ def read_pdf(path: str) -> str:
     return ""
 
 
+# Maps a needle found in a header line to its canonical section key, checked
+# in order; 'education' is handled separately because it must be a prefix
+SECTION_DISPATCH = (
+    ('experience', 'experience'),
+    ('skill', 'skills'),
+    ('project', 'projects'),
+    ('summary', 'summary'),
+    ('objective', 'summary'),
+)
+
+
+# WordprocessingML namespace for the zip-based fallback reader
+DOCX_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def read_docx_zip(path: str) -> str:
+    """Extract paragraph text straight from word/document.xml, no python-docx needed"""
+    import zipfile
+    from xml.etree import ElementTree
+    try:
+        with zipfile.ZipFile(path) as zf:
+            with zf.open('word/document.xml') as doc:
+                # iterparse streams the XML and lets us discard each paragraph
+                # element once read, keeping memory flat on big documents
+                pieces = []
+                for _, elem in ElementTree.iterparse(doc):
+                    if elem.tag == DOCX_NS + 't':
+                        if elem.text:
+                            pieces.append(elem.text)
+                    elif elem.tag == DOCX_NS + 'p':
+                        pieces.append('\n')
+                        elem.clear()
+        return ''.join(pieces).rstrip('\n')
+    except Exception as e:
+        print(f"DOCX zip extraction failed: {e}", file=sys.stderr)
+        return ''
+
+
 def read_docx(path: str) -> str:
+    # The zip reader skips python-docx's per-paragraph object construction
+    # entirely, so it is the primary path; fall back to python-docx for
+    # documents the streaming reader cannot handle
+    text = read_docx_zip(path)
+    if text:
+        return text
+    docx = lazy_import('docx')
     if docx is None:
         return ''
     try:
@@ -124,29 +348,29 @@ def read_docx(path: str) -> str:
 
 
 def split_sections(text: str):
-    # naive section split by header lines
-    lines = [l.strip() for l in text.splitlines()]
+    # naive section split by header lines; strip in the loop so we never
+    # materialize an intermediate list of stripped lines
     sections = {}
     current_key = 'summary'
     sections[current_key] = []
-    for line in lines:
-        lower = line.lower()
-        if any(k in lower and len(line) < 60 for k in SECTION_KEYS):
-            # start new section
-            if lower.startswith('education'):
-                current_key = 'education'
-            elif 'experience' in lower:
-                current_key = 'experience'
-            elif 'skill' in lower:
-                current_key = 'skills'
-            elif 'project' in lower:
-                current_key = 'projects'
-            elif 'summary' in lower or 'objective' in lower:
-                current_key = 'summary'
-            else:
-                current_key = line.lower()
-            sections.setdefault(current_key, [])
-            continue
+    for line in text.splitlines():
+        line = line.strip()
+        # Long lines are never headers; skip the lowercase and key scan entirely
+        if len(line) < 60:
+            lower = line.lower()
+            if has_section_key(lower):
+                # start new section
+                if lower.startswith('education'):
+                    current_key = 'education'
+                else:
+                    for needle, key in SECTION_DISPATCH:
+                        if needle in lower:
+                            current_key = key
+                            break
+                    else:
+                        current_key = lower
+                sections.setdefault(current_key, [])
+                continue
         sections.setdefault(current_key, []).append(line)
 
     # join
@@ -155,46 +379,52 @@ def split_sections(text: str):
 
 
 def extract_basics(text: str):
-    email = EMAIL_RE.search(text)
-    phone = PHONE_RE.search(text)
-    return {
-        'email': email.group(0) if email else '',
-        'phone': phone.group(0) if phone else '',
-    }
+    email = phone = ''
+    for m in BASICS_RE.finditer(text):
+        if m.lastgroup == 'email':
+            if not email:
+                email = m.group()
+        elif not phone:
+            phone = m.group()
+        if email and phone:
+            break
+    return {'email': email, 'phone': phone}
 
 
 def main():
-    if len(sys.argv) != 2:
-        print(json.dumps({'error': 'usage: parse_resume.py <file>'}), file=sys.stderr)
+    args = sys.argv[1:]
+    # raw_text doubles the JSON payload; callers that only want basics and
+    # sections can opt out via the flag or RESUME_INCLUDE_RAW=0. The Go
+    # handler relies on raw_text for its AI prompt, so emitting it stays the
+    # default.
+    include_raw = (os.environ.get('RESUME_INCLUDE_RAW') != '0'
+                   and '--no-raw-text' not in args)
+    args = [a for a in args if a != '--no-raw-text']
+    if len(args) != 1:
+        print(json.dumps({'error': 'usage: parse_resume.py [--no-raw-text] <file>'}), file=sys.stderr)
         sys.exit(1)
 
-    path = sys.argv[1]
+    path = args[0]
     ext = os.path.splitext(path)[1].lower()
 
     print(f"Processing file: {path} with extension: {ext}", file=sys.stderr)
 
     if ext == '.pdf':
-        if pdf_extract_text is None:
-            print("PDF extraction not available", file=sys.stderr)
+        # read_pdf tries every available backend itself, so no gate on any
+        # single extractor here
+        try:
+            text = read_pdf(path)
+            print(f"Extracted {len(text)} characters from PDF", file=sys.stderr)
+        except Exception as e:
+            print(f"PDF extraction failed: {e}", file=sys.stderr)
             text = ''
-        else:
-            try:
-                text = read_pdf(path)
-                print(f"Extracted {len(text)} characters from PDF", file=sys.stderr)
-            except Exception as e:
-                print(f"PDF extraction failed: {e}", file=sys.stderr)
-                text = ''
     elif ext in ('.docx', '.doc'):
-        if docx is None:
-            print("DOCX extraction not available", file=sys.stderr)
+        try:
+            text = read_docx(path)
+            print(f"Extracted {len(text)} characters from DOCX", file=sys.stderr)
+        except Exception as e:
+            print(f"DOCX extraction failed: {e}", file=sys.stderr)
             text = ''
-        else:
-            try:
-                text = read_docx(path)
-                print(f"Extracted {len(text)} characters from DOCX", file=sys.stderr)
-            except Exception as e:
-                print(f"DOCX extraction failed: {e}", file=sys.stderr)
-                text = ''
     else:
         try:
             text = read_txt(path)
@@ -203,7 +433,8 @@ def main():
             print(f"Text file reading failed: {e}", file=sys.stderr)
             text = ''
 
-    if not text.strip():
+    # isspace avoids strip()'s full copy of the text for a truthiness check
+    if not text or text.isspace():
         print("No text extracted from file", file=sys.stderr)
         out = {
             'raw_text': '',
@@ -221,16 +452,21 @@ def main():
         print(f"Found sections: {list(sections.keys())}", file=sys.stderr)
 
         out = {
-            'raw_text': text,
             'email': basics.get('email', ''),
             'phone': basics.get('phone', ''),
             'sections': sections,
         }
-    
-    # Only print JSON to stdout, everything else to stderr
-    print(json.dumps(out, ensure_ascii=False), file=sys.stdout)
+        if include_raw:
+            out['raw_text'] = text
+
+    # Only write JSON to stdout, everything else to stderr; raw bytes skip
+    # the TextIOWrapper encoding layer
+    if orjson is not None:
+        payload = orjson.dumps(out)
+    else:
+        payload = json.dumps(out, ensure_ascii=False).encode('utf-8')
+    sys.stdout.buffer.write(payload)
+    sys.stdout.buffer.write(b"\n")
 
 if __name__ == '__main__':
     main()
-
-